@@ -19,16 +19,206 @@ Outputs:
 from __future__ import annotations
 
 import argparse
+import bisect
 import json
 import re
 import sys
 from collections import defaultdict
+from functools import lru_cache
+from itertools import groupby, product
+from operator import itemgetter
 from pathlib import Path
-from re import Match
-from typing import Any, Dict, List, Optional, Tuple
+from re import Match, Pattern
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import pdfplumber
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON output
+    orjson = None
+
+
+# -----------------------------------------------------------------------------
+# Precompiled patterns
+# -----------------------------------------------------------------------------
+
+# Month, GlobHor (second column) and E_Grid (second-to-last of 8+ columns).
+_MONTH_ROW_RE = re.compile(
+    r"^(January|February|March|April|May|June|July|August|September|October"
+    r"|November|December)\b\S*\s+([-\d.,]+)\s+(?:\S+\s+){4,}(\S+)\s+\S+$"
+)
+_MODULES_RE = re.compile(r"Nb\.\s*of\s*modules\s*(\d+)units?")
+_NUM_RE = re.compile(r"([0-9]*\.?[0-9]+)")
+_WIDE_GAP_RE = re.compile(r"\s{2,}")
+
+# Section headings (union of patterns from both versions), matched against the
+# lowercased document text
+_SECTION_PATTERNS = {
+    name: re.compile(pattern)
+    for name, pattern in {
+        "Project Summary": r"project summary|system summary|results summary",
+        "PV Array Characteristics": r"pv array characteristics|array characteristics|pv modules|module configuration",
+        "Total Inverter Power": r"total inverter power",
+        "System Losses": r"system losses|loss diagram",
+        "Array Losses": r"array losses",
+        "Horizon Definition": r"horizon definition",
+        "Near Shading": r"near shading|iso-shadings diagram",
+        "Main Results": r"main results",
+        "Predefined Graphs": r"predef\.? graphs",
+        "P50-P90 Evaluation": r"p50.*p90 evaluation",
+    }.items()
+}
+
+# Equipment blocks
+_PV_MODULE_BLOCK_RE = re.compile(
+    r"\bPV\s+module\b(.{0,2200})", re.IGNORECASE | re.DOTALL
+)
+_PV_MODULE_LINE_RE = re.compile(r"\nPV\s*module\b", re.IGNORECASE)
+_INVERTER_WORD_RE = re.compile(r"\bInverter\b", re.IGNORECASE)
+_MANUFACTURER_RE = re.compile(r"\bManufacturer\b", re.IGNORECASE)
+_MODEL_RE = re.compile(r"\bModel\b", re.IGNORECASE)
+_UNIT_NOM_POWER_RE = re.compile(r"Unit\s+Nom\.?\s*Power", re.IGNORECASE)
+
+# Orientation
+_ORIENTATION_RE = re.compile(r"Orientation\s*#?\s*(\d+)", re.IGNORECASE)
+_TILT_AZ_RE = re.compile(
+    r"Tilt\s*[/]?\s*Azimuth\s*([-\d.]+)\s*[/]\s*([-\d.]+)°?", re.IGNORECASE
+)
+
+# Inverter / MPPT notation
+_INV_RANGE_RE = re.compile(
+    r"INV\s*([A-Za-z]*)(\d+)\s*-\s*([A-Za-z]*)(\d+)", re.IGNORECASE
+)
+_INV_SINGLE_RE = re.compile(r"INV\s*([A-Za-z]*)(\d+)", re.IGNORECASE)
+_MPPT_PREFIX_RE = re.compile(r"^MPPT\s*", re.IGNORECASE)
+_INT_RANGE_RE = re.compile(r"(\d+)\s*-\s*(\d+)")
+_INT_RE = re.compile(r"(\d+)")
+_MPPT_NUM_RE = re.compile(r"^MPPT\s*(\d+)$", re.IGNORECASE)
+
+# Array blocks
+_HEADER_INV_MPPT_RE = re.compile(r"INV\s+(.+?)\s+MPPT", re.IGNORECASE)
+_HEADER_INV_RE = re.compile(r"INV\s*(.+?)(?:\s+|$)", re.IGNORECASE)
+_MPPT_HEADER_RE = re.compile(r"MPPT[#\s]*([0-9,\-\s]+)", re.IGNORECASE)
+
+# Array block fields, matched against the lowercased block text (numbers only)
+_NUM_INVERTERS_RE = re.compile(
+    r"number of inverters\s*(\d+)\s*\*\s*mppt\s*([\d.]+)%\s*([\d.]+)\s*unit"
+)
+_ARRAY_ORIENTATION_RE = re.compile(r"orientation\s*#?\s*(\d+)")
+_NUM_PV_MODULES_RE = re.compile(r"number of pv modules\s*(\d+)units?")
+_NOMINAL_STC_RE = re.compile(r"nominal\s*\(stc\)\s*([\d.]+)kwp")
+_MODULES_CFG_RE = re.compile(r"modules\s*(\d+)\s*string[s]?\s*x\s*(\d+)")
+_ARRAY_TILT_AZ_RE = re.compile(r"tilt/azimuth\s*([-\d.]+)\s*/\s*([-\d.]+)\s*°")
+_U_MPP_RE = re.compile(r"u mpp\s*([\d.]+)v")
+_I_MPP_RE = re.compile(r"i mpp\s*([\d.]+)a")
+
+# Array pages and blocks
+_ARRAY_PAGE_RES = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"PV Array Characteristics",
+        r"Array\s*#?\s*\d+",
+        r"Array Characteristics",
+        r"PV Modules",
+        r"Module Configuration",
+    )
+)
+_ARRAY_HEAD_RE = re.compile(r"Array\s*#?\s*(\d+)", re.IGNORECASE)
+_ARRAY_STOP_RE = re.compile(
+    r"Array\s*#?\s*\d+|AC wiring losses|Page \d+/\d+", re.IGNORECASE
+)
+_MODULE_STRINGS_RE = re.compile(r"Modules\s+\d+\s+(?:string|Strings)", re.IGNORECASE)
+_INVERTER_HEADING_RE = re.compile(r"Inverter", re.IGNORECASE)
+_INV_NAME_RE = re.compile(r"^[A-Za-z0-9\-_.]+$")
+_INV_ID_RE = re.compile(r"^INV\D*(\d+)$", re.IGNORECASE)
+_INV_LABEL_RE = re.compile(r"^INV([A-Za-z]*)(\d+)$", re.IGNORECASE)
+
+# Single-configuration fallback and inverter totals
+_PV_ARRAY_CHAR_RE = re.compile(r"PV Array Characteristics", re.IGNORECASE)
+_PV_MODULES_UNITS_RE = re.compile(
+    r"Number of PV modules\s*(\d+)\s*units?", re.IGNORECASE
+)
+_NB_MODULES_UNITS_RE = re.compile(
+    r"Nb\.\s*of\s*modules\s*(\d+)\s*units?", re.IGNORECASE
+)
+_TOTAL_INV_POWER_RE = re.compile(
+    r"Total\s+inverter\s+power.*?(?:Number of inverters|Nb\.\s*of\s*units).*?(\d+)",
+    re.IGNORECASE | re.DOTALL,
+)
+_INV_UNITS_RE = re.compile(r"Number of inverters\s*(\d+)\s*units?", re.IGNORECASE)
+_NB_UNITS_RE = re.compile(r"Nb\.\s*of\s*units\s*(\d+)\s*units?", re.IGNORECASE)
+_CONFIG_CFG_RE = re.compile(
+    r"Modules\s*(\d+)\s*(?:string[s]?|Strings)\s*x\s*(\d+)\s*In\s*series",
+    re.IGNORECASE,
+)
+_CONFIG_TILT_AZ_RE = re.compile(
+    r"Tilt/Azimuth\s*([-\d.]+)\s*/\s*([-\d.]+)\s*°", re.IGNORECASE
+)
+
+# Array losses
+# Sub-section headers in priority order, plus one alternation to detect any.
+_LOSS_SECTION_HEADERS = tuple(
+    (key, re.compile(pattern, re.IGNORECASE))
+    for key, pattern in (
+        ("soiling_losses", r"Array Soiling Losses"),
+        ("thermal_losses", r"Thermal Loss factor"),
+        ("module_mismatch_losses", r"Module mismatch losses"),
+        ("iam_losses", r"IAM loss factor"),
+        ("ac_wiring_losses", r"AC wiring losses"),
+    )
+)
+_LOSS_SECTION_HEADER_RE = re.compile(
+    "|".join(pattern.pattern for _, pattern in _LOSS_SECTION_HEADERS), re.IGNORECASE
+)
+_AVG_LOSS_FRACTION_RE = re.compile(r"Average loss Fraction\s+([\d.]+)%")
+_LOSS_FRACTION_RE = re.compile(r"Loss Fraction\s+([\d.]+)%")
+_SIGNED_LOSS_FRACTION_RE = re.compile(r"Loss Fraction\s+(-?[\d.]+)%")
+_DECIMAL_PERCENT_RE = re.compile(r"\d+\.\d+%")
+_SOILING_MONTHS = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+_IAM_ANGLES = (0, 20, 30, 40, 50, 60, 70, 80, 90)
+_DECIMAL_RE = re.compile(r"\d+\.\d+")
+_UC_CONST_RE = re.compile(r"Uc \(const\)\s+([\d.]+)")
+_UV_WIND_RE = re.compile(r"Uv \(wind\)\s+([\d.]+)")
+_IAM_EFFECT_RE = re.compile(r"Incidence effect \(IAM\):\s+(.+)")
+_GLOBAL_WIRING_RE = re.compile(
+    r"Global wiring resistance\s+([\d.]+)mΩ\s+Loss Fraction\s+([\d.]+)%"
+)
+_ARRAY_NOTATION_RE = re.compile(r"Array #(\d+)\s*-\s*(.+?)(?=Array #|\s*Global|$)")
+_GLOBAL_RES_RE = re.compile(r"Global array res\.\s*([\d.]+)mΩ")
+_INV_VOLTAGE_RE = re.compile(r"Inverter voltage\s+([\d.]+)Vac")
+_WIRE_SECTION_RE = re.compile(r"Wire section\s+(.+)")
+_WIRES_LENGTH_RE = re.compile(r"Wires length\s+([\d.]+)m")
+
+# Parsed array fields left out of the array_configurations output.
+_ARRAY_INTERNAL_KEYS = frozenset(
+    {
+        "expanded_combinations",
+        "original_notation",
+        "inverter_manufacturer",
+        "inverter_model",
+        "inverter_unit_nom_power_raw",
+        "inverter_unit_nom_power_kw",
+        "module_manufacturer",
+        "module_model",
+        "module_unit_nom_power_raw",
+        "module_unit_nom_power_w",
+    }
+)
+
 
 # -----------------------------------------------------------------------------
 # Helper functions
@@ -45,7 +235,7 @@ def clean_power_to_kw_or_w(power_str: str) -> Optional[float]:
     if not power_str:
         return None
     s = power_str.strip().lower()
-    m = re.search(r"([0-9]*\.?[0-9]+)", s)
+    m = _NUM_RE.search(s)
     if not m:
         return None
     value = float(m.group(1))
@@ -56,6 +246,80 @@ def clean_power_to_kw_or_w(power_str: str) -> Optional[float]:
     return value
 
 
+@lru_cache(maxsize=64)
+def _two_column_patterns(label: str) -> Tuple[Pattern[str], Pattern[str]]:
+    """Compile (repeated-label, single-label) row patterns for `label`."""
+    esc = re.escape(label)
+    return (
+        re.compile(rf"{esc}\s+(.+?)\s+{esc}\s+(.+)$", re.IGNORECASE),
+        re.compile(rf"{esc}\s+(.+)$", re.IGNORECASE),
+    )
+
+
+def _split_wide(s: str) -> Tuple[str, Optional[str]]:
+    """Split a stripped string at its first 2+ whitespace gap: (first, second).
+
+    `second` runs up to the next such gap, or is None if there is no gap.
+    """
+    # Printable text has no whitespace other than " ", so str.find suffices.
+    if not s.isprintable():
+        parts = _WIDE_GAP_RE.split(s)
+        return (parts[0], parts[1]) if len(parts) >= 2 else (s, None)
+    i = s.find("  ")
+    if i < 0:
+        return (s, None)
+    rest = s[i:].lstrip(" ")
+    j = rest.find("  ")
+    return (s[:i], rest[:j] if j >= 0 else rest)
+
+
+def _iter_array_blocks(text: str) -> Iterator[Tuple[str, str]]:
+    """Yield (block_text, array_id) for each "Array #N" block in text.
+
+    A block runs from its header to the next array header, "AC wiring
+    losses", a "Page n/m" footer or the end of the text.
+    """
+    # "$" without MULTILINE also matches before a trailing newline.
+    tail = len(text) - 1 if text.endswith("\n") else len(text)
+    pos = 0
+    while True:
+        head = _ARRAY_HEAD_RE.search(text, pos)
+        if head is None:
+            return
+        stop = _ARRAY_STOP_RE.search(text, head.end(), tail)
+        end = stop.start() if stop is not None else tail
+        yield text[head.start() : end], head.group(1)
+        pos = end
+
+
+def _to_float(s: str) -> float:
+    """Parse a table number, ignoring thousands separators (e.g. '12,345')."""
+    if "," in s:
+        s = s.replace(",", "")
+    return float(s)
+
+
+def _dump_json(path: str, obj: Any) -> None:
+    """Write `obj` as indented UTF-8 JSON, via orjson when it is installed.
+
+    orjson formats floats differently (e.g. 1e-05 as 1e-5) and writes NaN as
+    null; values it rejects (e.g. integers beyond 64 bits) fall back to json.
+    """
+    if orjson is not None:
+        try:
+            data = orjson.dumps(
+                obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            )
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            with open(path, "wb") as f:
+                f.write(data)
+            return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
 class PVsystParser:
     """Comprehensive parser for PVsyst PDF reports."""
 
@@ -82,6 +346,12 @@ class PVsystParser:
         self.array_losses: Dict[str, Any] = {}
         self.inverter_types: List[Dict[str, Any]] = []
 
+        # Joined document text for the blocks parse_pdf() is working on; only set
+        # while a parse runs.
+        self._text_source: Optional[Dict[int, Dict[str, Any]]] = None
+        self._all_text = ""
+        self._all_text_lower: Optional[str] = None
+
     # -------------------------------------------------------------------------
     # Text extraction
     # -------------------------------------------------------------------------
@@ -91,24 +361,64 @@ class PVsystParser:
         blocks: Dict[int, Dict[str, Any]] = {}
 
         print("  Extracting text with pdfplumber...")
+        for i, txt in self._iter_page_texts(pdf_path):
+            kv_pairs: List[Dict[str, str]] = []
+            others: List[str] = []
+            for raw in txt.splitlines():
+                ln = raw.strip()
+                if not ln:
+                    continue
+                k, sep, v = ln.partition(":")
+                if sep and k:
+                    kv_pairs.append({"key": k.rstrip(), "value": v.strip()})
+                else:
+                    others.append(ln)
+
+            blocks[i] = {"kv": kv_pairs, "text_lines": others, "full_text": txt}
+
+        return blocks
+
+    @staticmethod
+    def _iter_page_texts(pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """Yield (page number, text) and drop each page's cached layout after use."""
         with pdfplumber.open(pdf_path) as pdf:
             for i, page in enumerate(pdf.pages, start=1):
                 txt = page.extract_text() or ""
-                lines = [ln for ln in txt.splitlines() if ln.strip()]
+                page.close()
+                yield i, txt
 
-                kv_pairs: List[Dict[str, str]] = []
-                others: List[str] = []
-                for ln in lines:
-                    if ":" in ln and not ln.strip().startswith(":"):
-                        k, v = ln.split(":", 1)
-                        if k.strip():
-                            kv_pairs.append({"key": k.strip(), "value": v.strip()})
-                            continue
-                    others.append(ln.strip())
+    def _joined_text(self, blocks: Dict[int, Dict[str, Any]]) -> str:
+        """Return the full document text (pages in order).
 
-                blocks[i] = {"kv": kv_pairs, "text_lines": others, "full_text": txt}
+        During parse_pdf() the text of its blocks is joined once; other callers
+        get a fresh join.
+        """
+        if blocks is self._text_source:
+            return self._all_text
+        return "\n".join(blocks[p].get("full_text") or "" for p in sorted(blocks))
+
+    def _page_range_text(
+        self, blocks: Dict[int, Dict[str, Any]], start_page: int, end_page: int
+    ) -> str:
+        """Return the text of pages start_page..end_page joined with newlines."""
+        if (
+            end_page - start_page + 1 == len(blocks)
+            and start_page == min(blocks)
+            and end_page == max(blocks)
+        ):
+            # The range covers every page: same text as the whole document.
+            return self._joined_text(blocks)
+        return "\n".join(
+            blocks[p].get("full_text") or "" for p in range(start_page, end_page + 1)
+        )
 
-        return blocks
+    def _lowered_text(self, blocks: Dict[int, Dict[str, Any]]) -> str:
+        """Return `_joined_text(blocks).lower()`, kept alongside it during a parse."""
+        if blocks is not self._text_source:
+            return self._joined_text(blocks).lower()
+        if self._all_text_lower is None:
+            self._all_text_lower = self._all_text.lower()
+        return self._all_text_lower
 
     # -------------------------------------------------------------------------
     # Section identification
@@ -120,31 +430,23 @@ class PVsystParser:
         """Identify high-level sections in the document."""
         print("  Identifying sections...")
 
-        all_text = "\n".join(
-            blocks[p].get("full_text") or "" for p in sorted(blocks.keys())
-        )
+        all_text = self._joined_text(blocks)
 
-        # Union of patterns from both versions.
-        section_patterns = {
-            "Project Summary": r"Project summary|System summary|Results summary",
-            "PV Array Characteristics": r"PV Array Characteristics|Array Characteristics|PV Modules|Module Configuration",
-            "Total Inverter Power": r"Total inverter power",
-            "System Losses": r"System losses|Loss diagram",
-            "Array Losses": r"Array losses",
-            "Horizon Definition": r"Horizon definition",
-            "Near Shading": r"Near shading|Iso-shadings diagram",
-            "Main Results": r"Main results",
-            "Predefined Graphs": r"Predef\.? graphs",
-            "P50-P90 Evaluation": r"P50.*P90 evaluation",
-        }
+        # Literal lowercase patterns scan much faster than IGNORECASE ones.
+        # lower() keeps offsets unless a character expands (e.g. "İ").
+        lowered = self._lowered_text(blocks)
+        same_offsets = len(lowered) == len(all_text)
 
         sections: Dict[str, Dict[str, Any]] = {}
-        for section_name, pattern in section_patterns.items():
-            matches = list(re.finditer(pattern, all_text, re.IGNORECASE))
+        for section_name, pattern in _SECTION_PATTERNS.items():
+            if same_offsets:
+                matches = list(pattern.finditer(lowered))
+            else:
+                matches = list(re.finditer(pattern.pattern, all_text, re.IGNORECASE))
             if matches:
                 sections[section_name] = {
                     "start_positions": [m.start() for m in matches],
-                    "matches": [m.group() for m in matches],
+                    "matches": [all_text[m.start() : m.end()] for m in matches],
                 }
 
         return sections
@@ -153,9 +455,7 @@ class PVsystParser:
         self, blocks: Dict[int, Dict[str, Any]], sections: Dict[str, Dict[str, Any]]
     ) -> Dict[str, List[str]]:
         """Extract full text content for each identified section."""
-        all_text = "\n".join(
-            blocks[p].get("full_text") or "" for p in sorted(blocks.keys())
-        )
+        all_text = self._joined_text(blocks)
 
         all_starts: List[Tuple[int, str]] = []
         for sec_name, sec_data in sections.items():
@@ -184,15 +484,11 @@ class PVsystParser:
         if not line or not label:
             return (None, None)
 
-        pat_two = re.compile(
-            rf"{re.escape(label)}\s+(.+?)\s+{re.escape(label)}\s+(.+)$",
-            re.IGNORECASE,
-        )
+        pat_two, pat_one = _two_column_patterns(label)
         m = pat_two.search(line)
         if m:
             return (m.group(1).strip() or None, m.group(2).strip() or None)
 
-        pat_one = re.compile(rf"{re.escape(label)}\s+(.+)$", re.IGNORECASE)
         m = pat_one.search(line)
         if not m:
             return (None, None)
@@ -201,11 +497,7 @@ class PVsystParser:
         if not remainder:
             return (None, None)
 
-        parts = re.split(r"\s{2,}", remainder)
-        if len(parts) >= 2:
-            return (parts[0].strip() or None, parts[1].strip() or None)
-
-        return (remainder, None)
+        return _split_wide(remainder)
 
     @staticmethod
     def _second_column_value(line: str, label: str) -> Optional[str]:
@@ -218,7 +510,7 @@ class PVsystParser:
             return None
 
         s = power_str.strip().lower()
-        m = re.search(r"([0-9]*\.?[0-9]+)", s)
+        m = _NUM_RE.search(s)
         if not m:
             return None
 
@@ -236,24 +528,17 @@ class PVsystParser:
         module_info: Dict[str, Any] = {}
         inverter_info: Dict[str, Any] = {}
 
-        all_text = "\n".join(
-            blocks[p].get("full_text") or "" for p in sorted(blocks.keys())
-        )
-        m = re.search(
-            r"\bPV\s+module\b(.{0,2200})", all_text, re.IGNORECASE | re.DOTALL
-        )
+        all_text = self._joined_text(blocks)
+        m = _PV_MODULE_BLOCK_RE.search(all_text)
         if not m:
             self.module_info = module_info
             self.inverter_info = inverter_info
             return module_info, inverter_info
 
         block = "PV module\n" + m.group(1)
-        lines = [ln.strip() for ln in block.splitlines() if ln.strip()]
+        lines = [ln for ln in map(str.strip, block.splitlines()) if ln]
 
-        manu_line = next(
-            (ln for ln in lines if re.search(r"\bManufacturer\b", ln, re.IGNORECASE)),
-            None,
-        )
+        manu_line = next((ln for ln in lines if _MANUFACTURER_RE.search(ln)), None)
         if manu_line:
             left, right = self._two_column_values(manu_line, "Manufacturer")
             if left:
@@ -261,9 +546,7 @@ class PVsystParser:
             if right:
                 inverter_info["manufacturer"] = right
 
-        model_line = next(
-            (ln for ln in lines if re.search(r"\bModel\b", ln, re.IGNORECASE)), None
-        )
+        model_line = next((ln for ln in lines if _MODEL_RE.search(ln)), None)
         if model_line:
             left, right = self._two_column_values(model_line, "Model")
             if left:
@@ -271,14 +554,7 @@ class PVsystParser:
             if right:
                 inverter_info["model"] = right
 
-        power_line = next(
-            (
-                ln
-                for ln in lines
-                if re.search(r"Unit\s+Nom\.?\s*Power", ln, re.IGNORECASE)
-            ),
-            None,
-        )
+        power_line = next((ln for ln in lines if _UNIT_NOM_POWER_RE.search(ln)), None)
         if power_line:
             left, right = self._two_column_values(power_line, "Unit Nom. Power")
             if left is None and right is None:
@@ -322,34 +598,34 @@ class PVsystParser:
         """Extract Orientation #n entries and associate tilt/azimuth."""
         print("  Extracting orientations...")
 
-        all_text = "\n".join(
-            blocks[p].get("full_text") or "" for p in sorted(blocks.keys())
-        )
+        all_text = self._joined_text(blocks)
 
         orientations: Dict[str, Dict[str, Any]] = {}
 
-        ori_matches = list(
-            re.finditer(r"Orientation\s*#?\s*(\d+)", all_text, re.IGNORECASE)
-        )
-        tilt_matches = list(
-            re.finditer(
-                r"Tilt\s*[/]?\s*Azimuth\s*([-\d.]+)\s*[/]\s*([-\d.]+)°?",
-                all_text,
-                re.IGNORECASE,
-            )
-        )
+        # Cheap substring check before the regex scans. The needle avoids "i",
+        # which IGNORECASE also matches as "İ"/"ı" but lower() does not map.
+        if "entat" not in self._lowered_text(blocks):
+            print(f"    Found {len(orientations)} orientations")
+            return orientations
+
+        ori_matches = list(_ORIENTATION_RE.finditer(all_text))
+        tilt_matches = list(_TILT_AZ_RE.finditer(all_text))
+        tilt_positions = [t.start() for t in tilt_matches]
 
         for ori_m in ori_matches:
             ori_id = ori_m.group(1)
             ori_pos = ori_m.start()
 
+            # Nearest tilt by position; the earlier one wins a tie.
             closest_tilt: Optional[Match[str]] = None
-            min_dist = float("inf")
-            for tilt_m in tilt_matches:
-                dist = abs(tilt_m.start() - ori_pos)
-                if dist < min_dist:
-                    min_dist = dist
-                    closest_tilt = tilt_m
+            idx = bisect.bisect_left(tilt_positions, ori_pos)
+            if idx < len(tilt_positions):
+                closest_tilt = tilt_matches[idx]
+            if idx > 0 and (
+                closest_tilt is None
+                or ori_pos - tilt_positions[idx - 1] <= tilt_positions[idx] - ori_pos
+            ):
+                closest_tilt = tilt_matches[idx - 1]
 
             if closest_tilt:
                 tilt = float(closest_tilt.group(1))
@@ -368,11 +644,7 @@ class PVsystParser:
             if ori_id in orientations:
                 continue
             window = all_text[m.start() : m.start() + 800]
-            tilt_match = re.search(
-                r"Tilt\s*[/]?\s*Azimuth\s*([-\d.]+)\s*[/]\s*([-\d.]+)°?",
-                window,
-                re.IGNORECASE,
-            )
+            tilt_match = _TILT_AZ_RE.search(window)
             if tilt_match:
                 tilt = float(tilt_match.group(1))
                 az_pv = float(tilt_match.group(2))
@@ -409,24 +681,15 @@ class PVsystParser:
             if not part.upper().startswith("INV"):
                 part = "INV " + part
 
-            m_range = re.search(
-                r"INV\s*([A-Za-z]*)(\d+)\s*-\s*([A-Za-z]*)(\d+)",
-                part,
-                re.IGNORECASE,
-            )
+            m_range = _INV_RANGE_RE.search(part)
             if m_range:
-                p1, start, p2, end = (
-                    m_range.group(1),
-                    int(m_range.group(2)),
-                    m_range.group(3),
-                    int(m_range.group(4)),
-                )
-                p2 = p2 or p1
-                for i in range(start, end + 1):
-                    inverters.append(f"INV{p1}{i:02d}")
+                # The end prefix ("R1-R3") is assumed to match the start prefix.
+                prefix = m_range[1]
+                start, end = int(m_range[2]), int(m_range[4])
+                inverters.extend([f"INV{prefix}{i:02d}" for i in range(start, end + 1)])
                 continue
 
-            m_single = re.search(r"INV\s*([A-Za-z]*)(\d+)", part, re.IGNORECASE)
+            m_single = _INV_SINGLE_RE.search(part)
             if m_single:
                 prefix = m_single.group(1)
                 num = int(m_single.group(2))
@@ -437,20 +700,20 @@ class PVsystParser:
 
     def parse_mppt_range(self, mppt_text: str) -> List[str]:
         mppt_text = (mppt_text or "").strip()
-        mppt_text = re.sub(r"^MPPT\s*", "", mppt_text, flags=re.IGNORECASE)
+        mppt_text = _MPPT_PREFIX_RE.sub("", mppt_text)
         parts = [p.strip() for p in mppt_text.split(",") if p.strip()]
 
         mppts: List[str] = []
         for part in parts:
             if "-" in part:
-                m = re.search(r"(\d+)\s*-\s*(\d+)", part)
+                m = _INT_RANGE_RE.search(part)
                 if m:
                     start = int(m.group(1))
                     end = int(m.group(2))
                     for i in range(start, end + 1):
                         mppts.append(f"MPPT {i}")
             else:
-                m = re.search(r"(\d+)", part)
+                m = _INT_RE.search(part)
                 if m:
                     mppts.append(f"MPPT {int(m.group(1))}")
 
@@ -470,53 +733,38 @@ class PVsystParser:
             if isinstance(mppt_count, int) and mppt_count > 0:
                 mppt_ids = [f"MPPT {i}" for i in range(1, mppt_count + 1)]
 
-        combos: List[Dict[str, Any]] = []
         if not inverter_ids:
-            return combos
+            return []
 
         original_notation = array_data.get("original_notation", "")
 
-        if mppt_ids:
-            for inv in inverter_ids:
-                for mppt in mppt_ids:
-                    combos.append(
-                        {
-                            "array_id": array_id,
-                            "inverter": inv,
-                            "mppt": mppt,
-                            "original_notation": original_notation,
-                        }
-                    )
-        else:
-            for inv in inverter_ids:
-                combos.append(
-                    {
-                        "array_id": array_id,
-                        "inverter": inv,
-                        "mppt": None,
-                        "original_notation": original_notation,
-                    }
-                )
-
-        return combos
+        return [
+            {
+                "array_id": array_id,
+                "inverter": inv,
+                "mppt": mppt,
+                "original_notation": original_notation,
+            }
+            for inv, mppt in product(inverter_ids, mppt_ids or [None])
+        ]
 
     def _parse_pvsyst_inverter_type_block(self, text: str) -> Dict[str, Any]:
         """Parse a PVsyst equipment block between arrays; return inverter fields only."""
         if not text:
             return {}
 
-        lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+        lines = [ln for ln in map(str.strip, text.splitlines()) if ln]
         if not lines:
             return {}
 
         inv_idx: Optional[int] = None
         for i, ln in enumerate(lines):
-            if re.fullmatch(r"Inverter", ln, flags=re.IGNORECASE):
+            if _INVERTER_HEADING_RE.fullmatch(ln):
                 inv_idx = i
                 break
         if inv_idx is None:
             for i, ln in enumerate(lines):
-                if re.search(r"\bInverter\b", ln, flags=re.IGNORECASE):
+                if _INVERTER_WORD_RE.search(ln):
                     inv_idx = i
                     break
         if inv_idx is None:
@@ -525,34 +773,20 @@ class PVsystParser:
         inv_lines = lines[inv_idx:]
         out: Dict[str, Any] = {}
 
-        manu_line = next(
-            (
-                ln
-                for ln in inv_lines
-                if re.search(r"\bManufacturer\b", ln, re.IGNORECASE)
-            ),
-            None,
-        )
+        manu_line = next((ln for ln in inv_lines if _MANUFACTURER_RE.search(ln)), None)
         if manu_line:
             v = self._second_column_value(manu_line, "Manufacturer")
             if v:
                 out["inverter_manufacturer"] = v
 
-        model_line = next(
-            (ln for ln in inv_lines if re.search(r"\bModel\b", ln, re.IGNORECASE)), None
-        )
+        model_line = next((ln for ln in inv_lines if _MODEL_RE.search(ln)), None)
         if model_line:
             v = self._second_column_value(model_line, "Model")
             if v:
                 out["inverter_model"] = v
 
         power_line = next(
-            (
-                ln
-                for ln in inv_lines
-                if re.search(r"Unit\s+Nom\.?\s*Power", ln, re.IGNORECASE)
-            ),
-            None,
+            (ln for ln in inv_lines if _UNIT_NOM_POWER_RE.search(ln)), None
         )
         if power_line:
             v = self._second_column_value(power_line, r"Unit\s+Nom\.?\s*Power")
@@ -564,28 +798,45 @@ class PVsystParser:
 
         return out
 
-    def _parse_array_block(self, section_text: str, array_id: str) -> Dict[str, Any]:
+    def _parse_array_block(
+        self,
+        section_text: str,
+        array_id: str,
+        endpos: Optional[int] = None,
+        unit_wp: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Parse one `Array #n` block.
+
+        When `endpos` is given, the caller has already located any trailing
+        equipment block at that offset; only the text before it is parsed.
+        `unit_wp` is the module nameplate power in W, read once by the caller.
+        """
+        if endpos is not None and endpos < len(section_text):
+            section_text = section_text[:endpos].rstrip()
+
         array_data: Dict[str, Any] = {
             "array_id": array_id,
             "original_block_text": section_text,
             "original_notation": f"Array #{array_id}",
         }
 
-        header_line = section_text.splitlines()[0] if section_text.splitlines() else ""
+        header_line = section_text.partition("\n")[0]
+        # Numeric fields below are matched against this instead of IGNORECASE.
+        lowered = section_text.lower()
 
         inverter_ids: List[str] = []
 
         # Prefer INV ... MPPT header notation (better for complex ranges)
-        m_inv_mppt = re.search(r"INV\s+(.+?)\s+MPPT", header_line, re.IGNORECASE)
+        m_inv_mppt = _HEADER_INV_MPPT_RE.search(header_line)
         if m_inv_mppt:
-            inv_spec = m_inv_mppt.group(1).strip()
+            inv_spec = m_inv_mppt[1].strip()
             inverter_ids = self.parse_inverter_range(f"INV {inv_spec}")
 
         # Fallback: find INV specification in the header
         if not inverter_ids:
-            m_inv_spec = re.search(r"INV\s*(.+?)(?:\s+|$)", header_line, re.IGNORECASE)
+            m_inv_spec = _HEADER_INV_RE.search(header_line)
             if m_inv_spec:
-                inv_spec = m_inv_spec.group(1).strip()
+                inv_spec = m_inv_spec[1].strip()
                 inverter_ids = self.parse_inverter_range(f"INV {inv_spec}")
 
         if inverter_ids:
@@ -593,11 +844,9 @@ class PVsystParser:
             array_data["inverter_id"] = inverter_ids[0]
 
         # MPPT IDs from header, if present
-        m_mppt_header = re.search(
-            r"MPPT[#\s]*([0-9,\-\s]+)", header_line, re.IGNORECASE
-        )
+        m_mppt_header = _MPPT_HEADER_RE.search(header_line)
         if m_mppt_header:
-            mppt_ids = self.parse_mppt_range(m_mppt_header.group(1))
+            mppt_ids = self.parse_mppt_range(m_mppt_header[1])
             if mppt_ids:
                 array_data["mppt_ids"] = mppt_ids
 
@@ -605,63 +854,50 @@ class PVsystParser:
         # PVsyst uses this line to describe how many inverter units / MPPT inputs are used.
         # In reports where the header expands to multiple inverters (e.g. INV01-03), the
         # first number is commonly the total MPPT endpoints across all listed inverters.
-        m_mppt = re.search(
-            r"Number of inverters\s*(\d+)\s*\*\s*MPPT\s*([\d.]+)%\s*([\d.]+)\s*unit",
-            section_text,
-            re.IGNORECASE,
-        )
+        m_mppt = _NUM_INVERTERS_RE.search(lowered)
         if m_mppt:
-            total_mppts = int(m_mppt.group(1))
+            total_mppts = int(m_mppt[1])
             num_invs = len(inverter_ids) if inverter_ids else 1
             mppt_per_inv = max(1, total_mppts // max(1, num_invs))
             array_data["mppt_total_endpoints"] = total_mppts
             array_data["mppt_count"] = mppt_per_inv
-            array_data["mppt_share_percent"] = float(m_mppt.group(2))
-            array_data["inverter_unit_fraction"] = float(m_mppt.group(3))
+            array_data["mppt_share_percent"] = float(m_mppt[2])
+            array_data["inverter_unit_fraction"] = float(m_mppt[3])
 
         # Orientation #n inside the block
-        m_ori = re.search(r"Orientation\s*#?\s*(\d+)", section_text, re.IGNORECASE)
+        m_ori = _ARRAY_ORIENTATION_RE.search(lowered)
         if m_ori:
-            array_data["orientation_id"] = int(m_ori.group(1))
+            array_data["orientation_id"] = int(m_ori[1])
 
         # Number of PV modules
-        m_mods = re.search(
-            r"Number of PV modules\s*(\d+)units?", section_text, re.IGNORECASE
-        )
+        m_mods = _NUM_PV_MODULES_RE.search(lowered)
         if m_mods:
-            array_data["number_of_modules"] = int(m_mods.group(1))
+            array_data["number_of_modules"] = int(m_mods[1])
 
-        unit_wp = self.module_info.get("unit_nom_power_w")
-        if isinstance(unit_wp, int) and "number_of_modules" in array_data:
+        if unit_wp is not None and "number_of_modules" in array_data:
             nominal_kwp_from_module = unit_wp * array_data["number_of_modules"] / 1000.0
             array_data["nominal_stc_kwp_from_module"] = round(
                 nominal_kwp_from_module, 3
             )
 
-        m_stc = re.search(
-            r"Nominal\s*\(STC\)\s*([\d.]+)kWp", section_text, re.IGNORECASE
-        )
+        m_stc = _NOMINAL_STC_RE.search(lowered)
         if m_stc:
-            array_data["nominal_stc_kwp"] = float(m_stc.group(1))
+            array_data["nominal_stc_kwp"] = float(m_stc[1])
 
         # Modules configuration
-        m_cfg = re.search(
-            r"Modules\s*(\d+)\s*string[s]?\s*x\s*(\d+)", section_text, re.IGNORECASE
-        )
+        m_cfg = _MODULES_CFG_RE.search(lowered)
         if m_cfg:
-            strings = int(m_cfg.group(1))
-            series = int(m_cfg.group(2))
+            strings = int(m_cfg[1])
+            series = int(m_cfg[2])
             array_data["strings"] = strings
             array_data["modules_in_series"] = series
             array_data["modules_config_text"] = f"Modules {strings} string x {series}"
 
         # Tilt/Azimuth
-        m_tilt_az = re.search(
-            r"Tilt/Azimuth\s*([-\d.]+)\s*/\s*([-\d.]+)\s*°", section_text, re.IGNORECASE
-        )
+        m_tilt_az = _ARRAY_TILT_AZ_RE.search(lowered)
         if m_tilt_az:
-            tilt = float(m_tilt_az.group(1))
-            az_pv = float(m_tilt_az.group(2))
+            tilt = float(m_tilt_az[1])
+            az_pv = float(m_tilt_az[2])
             az_compass = self.pvsyst_azimuth_to_compass(az_pv)
             array_data["tilt"] = tilt
             array_data["azimuth_pvsyst_deg"] = az_pv
@@ -669,21 +905,20 @@ class PVsystParser:
             array_data["azimuth_compass_deg"] = az_compass
 
         # U mpp / I mpp
-        m_umpp = re.search(r"U mpp\s*([\d.]+)V", section_text, re.IGNORECASE)
+        m_umpp = _U_MPP_RE.search(lowered)
         if m_umpp:
-            array_data["u_mpp_v"] = float(m_umpp.group(1))
-        m_impp = re.search(r"I mpp\s*([\d.]+)A", section_text, re.IGNORECASE)
+            array_data["u_mpp_v"] = float(m_umpp[1])
+        m_impp = _I_MPP_RE.search(lowered)
         if m_impp:
-            array_data["i_mpp_a"] = float(m_impp.group(1))
+            array_data["i_mpp_a"] = float(m_impp[1])
 
         # Inverter details embedded in this array block (seen in some PVsyst exports)
-        m_eq = re.search(
-            r"\nPV\s*module\b.*", section_text, flags=re.IGNORECASE | re.DOTALL
-        )
-        if m_eq:
-            array_data.update(
-                self._parse_pvsyst_inverter_type_block(section_text[m_eq.start() :])
-            )
+        if endpos is None:
+            m_eq = _PV_MODULE_LINE_RE.search(section_text)
+            if m_eq:
+                array_data.update(
+                    self._parse_pvsyst_inverter_type_block(section_text[m_eq.start() :])
+                )
 
         return array_data
 
@@ -709,7 +944,7 @@ class PVsystParser:
             inv_input = input("Enter inverter IDs (comma-separated): ").strip()
             if inv_input:
                 inv_list = [inv.strip() for inv in inv_input.split(",") if inv.strip()]
-                valid = all(re.match(r"^[A-Za-z0-9\-_.]+$", inv) for inv in inv_list)
+                valid = all(_INV_NAME_RE.match(inv) for inv in inv_list)
                 if valid:
                     user_inverter_ids = inv_list
                 else:
@@ -744,13 +979,19 @@ class PVsystParser:
 
     def _assign_missing_mppt_labels(self) -> None:
         """Assign MPPT labels only for combinations where mppt is None."""
-        by_inverter: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        for combo in self.expanded_arrays:
-            by_inverter[combo["inverter"]].append(combo)
+        if all(c.get("mppt") is not None for c in self.expanded_arrays):
+            return
 
-        mppt_num_re = re.compile(r"^MPPT\s*(\d+)$", re.IGNORECASE)
+        # Stable ordering of missing MPPTs within each inverter
+        def sort_key(c: Dict[str, Any]) -> Tuple[str, int, str]:
+            try:
+                aid = int(c.get("array_id") or 0)
+            except ValueError:
+                aid = 0
+            return (c["inverter"], aid, c.get("original_notation") or "")
 
-        for inv, combos in by_inverter.items():
+        ordered = sorted(self.expanded_arrays, key=sort_key)
+        for _inv, combos in groupby(ordered, key=itemgetter("inverter")):
             used: set[int] = set()
             missing: List[Dict[str, Any]] = []
 
@@ -759,23 +1000,12 @@ class PVsystParser:
                 if mppt is None:
                     missing.append(c)
                     continue
-                m = mppt_num_re.match(str(mppt).strip())
+                if not isinstance(mppt, str):
+                    mppt = str(mppt)
+                m = _MPPT_NUM_RE.match(mppt.strip())
                 if m:
                     used.add(int(m.group(1)))
 
-            if not missing:
-                continue
-
-            # Stable ordering of missing MPPTs
-            def sort_key(c: Dict[str, Any]) -> Tuple[int, str]:
-                try:
-                    aid = int(c.get("array_id") or 0)
-                except ValueError:
-                    aid = 0
-                return (aid, c.get("original_notation") or "")
-
-            missing.sort(key=sort_key)
-
             next_num = 1
             for c in missing:
                 while next_num in used:
@@ -818,23 +1048,21 @@ class PVsystParser:
 
     @staticmethod
     def _sort_inv_ids(inv_ids: List[str]) -> List[str]:
-        def key(inv: str) -> Tuple[int, str]:
-            m = re.match(r"^INV\D*(\d+)$", inv, re.IGNORECASE)
-            if m:
-                return (int(m.group(1)), inv)
-            return (10**9, inv)
-
-        return sorted(inv_ids, key=key)
+        # Decorate in one pass; unnumbered ids sort last, by name.
+        decorated = sorted(
+            (int(m.group(1)) if m else 10**9, inv)
+            for m, inv in zip(map(_INV_ID_RE.match, inv_ids), inv_ids)
+        )
+        return [inv for _, inv in decorated]
 
     @staticmethod
     def _sort_mppt_ids(mppt_ids: List[str]) -> List[str]:
-        def key(mppt: str) -> Tuple[int, str]:
-            m = re.match(r"^MPPT\s*(\d+)$", mppt, re.IGNORECASE)
-            if m:
-                return (int(m.group(1)), mppt)
-            return (10**9, mppt)
-
-        return sorted(mppt_ids, key=key)
+        # Decorate in one pass; unnumbered ids sort last, by name.
+        decorated = sorted(
+            (int(m.group(1)) if m else 10**9, mppt)
+            for m, mppt in zip(map(_MPPT_NUM_RE.match, mppt_ids), mppt_ids)
+        )
+        return [mppt for _, mppt in decorated]
 
     def _allocate_strings_single_config(
         self,
@@ -849,25 +1077,22 @@ class PVsystParser:
         strings are exhausted or the inverter's MPPTs reach strings_per_mppt_max.
         Then move to the next inverter.
         """
-        alloc: Dict[Tuple[str, str], int] = {
-            (inv, mppt): 0 for inv in inverter_ids for mppt in mppt_ids
-        }
+        alloc: Dict[Tuple[str, str], int] = dict.fromkeys(
+            product(inverter_ids, mppt_ids), 0
+        )
         remaining = int(total_strings)
 
-        # Round-robin allocation across all inverter-MPPT endpoints
+        # Round-robin allocation across all inverter-MPPT endpoints. Each pass
+        # adds one string to every endpoint below the cap and all start empty,
+        # so the passes fill evenly: full passes everywhere, plus one string on
+        # the first `extra` endpoints.
         all_endpoints = [(inv, mppt) for mppt in mppt_ids for inv in inverter_ids]
-        while remaining > 0:
-            progressed = False
-            for inv, mppt in all_endpoints:
-                if remaining <= 0:
-                    break
-                key = (inv, mppt)
-                if alloc[key] < strings_per_mppt_max:
-                    alloc[key] += 1
-                    remaining -= 1
-                    progressed = True
-            if not progressed:
-                break
+        if remaining > 0 and all_endpoints and strings_per_mppt_max > 0:
+            placed = min(remaining, len(all_endpoints) * strings_per_mppt_max)
+            per_endpoint, extra = divmod(placed, len(all_endpoints))
+            for i, key in enumerate(all_endpoints):
+                alloc[key] = per_endpoint + 1 if i < extra else per_endpoint
+            remaining -= placed
 
         if remaining > 0:
             print(
@@ -875,13 +1100,11 @@ class PVsystParser:
                 "distributing beyond per-MPPT max"
             )
             # Best-effort: distribute remaining across all endpoints round-robin without cap.
-            all_endpoints = [(inv, mppt) for mppt in mppt_ids for inv in inverter_ids]
-            idx = 0
-            while remaining > 0 and all_endpoints:
-                inv, mppt = all_endpoints[idx % len(all_endpoints)]
-                alloc[(inv, mppt)] += 1
-                remaining -= 1
-                idx += 1
+            if all_endpoints:
+                per_endpoint, extra = divmod(remaining, len(all_endpoints))
+                for i, key in enumerate(all_endpoints):
+                    alloc[key] += per_endpoint + 1 if i < extra else per_endpoint
+                remaining = 0
 
         return alloc
 
@@ -890,42 +1113,26 @@ class PVsystParser:
         if not text:
             return None
 
-        if not re.search(r"PV Array Characteristics", text, re.IGNORECASE):
+        if not _PV_ARRAY_CHAR_RE.search(text):
             return None
 
-        m_mods = re.search(
-            r"Number of PV modules\s*(\d+)\s*units?", text, re.IGNORECASE
-        )
+        m_mods = _PV_MODULES_UNITS_RE.search(text)
         if not m_mods:
-            m_mods = re.search(
-                r"Nb\.\s*of\s*modules\s*(\d+)\s*units?", text, re.IGNORECASE
-            )
+            m_mods = _NB_MODULES_UNITS_RE.search(text)
         if not m_mods:
             return None
 
         # Look for "Total inverter power" followed by "Number of inverters" and the number (possibly on next lines)
-        m_inv = re.search(
-            r"Total\s+inverter\s+power.*?(?:Number of inverters|Nb\.\s*of\s*units).*?(\d+)",
-            text,
-            re.IGNORECASE | re.DOTALL,
-        )
+        m_inv = _TOTAL_INV_POWER_RE.search(text)
         if not m_inv:
-            m_inv = re.search(
-                r"Number of inverters\s*(\d+)\s*units?", text, re.IGNORECASE
-            )
+            m_inv = _INV_UNITS_RE.search(text)
         if not m_inv:
-            m_inv = re.search(
-                r"Nb\.\s*of\s*units\s*(\d+)\s*units?", text, re.IGNORECASE
-            )
+            m_inv = _NB_UNITS_RE.search(text)
         if not m_inv:
             return None
 
         # Accept both "string(s)" and "Strings", tolerate "17In series".
-        m_cfg = re.search(
-            r"Modules\s*(\d+)\s*(?:string[s]?|Strings)\s*x\s*(\d+)\s*In\s*series",
-            text,
-            re.IGNORECASE,
-        )
+        m_cfg = _CONFIG_CFG_RE.search(text)
         if not m_cfg:
             return None
 
@@ -975,9 +1182,7 @@ class PVsystParser:
         }
 
         # Tilt/Azimuth if present
-        m_tilt_az = re.search(
-            r"Tilt/Azimuth\s*([-\d.]+)\s*/\s*([-\d.]+)\s*°", text, re.IGNORECASE
-        )
+        m_tilt_az = _CONFIG_TILT_AZ_RE.search(text)
         if m_tilt_az:
             tilt = float(m_tilt_az.group(1))
             az_pv = float(m_tilt_az.group(2))
@@ -1009,13 +1214,9 @@ class PVsystParser:
             return None
 
         total_inv_text = "\n".join(self.section_contents["Total Inverter Power"])
-        m_inv = re.search(
-            r"Number of inverters\s*(\d+)\s*units?", total_inv_text, re.IGNORECASE
-        )
+        m_inv = _INV_UNITS_RE.search(total_inv_text)
         if not m_inv:
-            m_inv = re.search(
-                r"Nb\.\s*of\s*units\s*(\d+)\s*units?", total_inv_text, re.IGNORECASE
-            )
+            m_inv = _NB_UNITS_RE.search(total_inv_text)
 
         return int(m_inv.group(1)) if m_inv else None
 
@@ -1027,13 +1228,13 @@ class PVsystParser:
         pages_with_arrays: List[int] = []
         for page_num, page_data in blocks.items():
             full = page_data.get("full_text", "") or ""
-            if (
-                re.search(r"PV Array Characteristics", full, re.IGNORECASE)
-                or re.search(r"Array\s*#?\s*\d+", full, re.IGNORECASE)
-                or re.search(r"Array Characteristics", full, re.IGNORECASE)
-                or re.search(r"PV Modules", full, re.IGNORECASE)
-                or re.search(r"Module Configuration", full, re.IGNORECASE)
-            ):
+            # Every marker contains "array" or "modul"; these needles have no
+            # letters with extra IGNORECASE equivalents (i, s, k), so a miss on
+            # the lowered page rules out all five patterns.
+            lowered = full.lower()
+            if "array" not in lowered and "modul" not in lowered:
+                continue
+            if any(pattern.search(full) for pattern in _ARRAY_PAGE_RES):
                 pages_with_arrays.append(int(page_num))
 
         if not pages_with_arrays:
@@ -1044,40 +1245,30 @@ class PVsystParser:
         start_page = pages_with_arrays[0]
         end_page = pages_with_arrays[-1]
 
-        combined_text = "\n".join(
-            blocks[p].get("full_text") or "" for p in range(start_page, end_page + 1)
-        )
-
-        array_pattern = re.compile(
-            r"(Array\s*#?\s*(\d+).*?)(?=Array\s*#?\s*\d+|AC wiring losses|Page \d+/\d+|$)",
-            re.DOTALL | re.IGNORECASE,
-        )
+        combined_text = self._page_range_text(blocks, start_page, end_page)
 
         arrays: Dict[str, Dict[str, Any]] = {}
         seen_ids: set[str] = set()
         pending_inverter_type: Dict[str, Any] = {}
 
-        for match in array_pattern.finditer(combined_text):
-            block_text = match.group(1)
-            array_id = match.group(2)
+        unit_wp = self.module_info.get("unit_nom_power_w")
+        if not isinstance(unit_wp, int):
+            unit_wp = None
 
+        for block_text, array_id in _iter_array_blocks(combined_text):
             if array_id in seen_ids:
                 continue
 
-            if not re.search(
-                r"Modules\s+\d+\s+(?:string|Strings)", block_text, re.IGNORECASE
-            ):
+            if not _MODULE_STRINGS_RE.search(block_text):
                 continue
 
-            trailing_equipment = None
-            m_eq = re.search(
-                r"\nPV\s*module\b.*", block_text, flags=re.IGNORECASE | re.DOTALL
-            )
-            if m_eq:
-                trailing_equipment = block_text[m_eq.start() :]
-                block_text = block_text[: m_eq.start()].rstrip()
+            # Equipment listed after the array block applies to the next array.
+            m_eq = _PV_MODULE_LINE_RE.search(block_text)
+            eq_start = m_eq.start() if m_eq else len(block_text)
 
-            array_data = self._parse_array_block(block_text, array_id)
+            array_data = self._parse_array_block(
+                block_text, array_id, endpos=eq_start, unit_wp=unit_wp
+            )
 
             if pending_inverter_type and array_data.get("inverter_id"):
                 if not array_data.get("inverter_model") and not array_data.get(
@@ -1086,7 +1277,8 @@ class PVsystParser:
                     array_data.update(pending_inverter_type)
 
             if interactive:
-                header_line = array_data.get("original_block_text", "").splitlines()[0]
+                block = array_data.get("original_block_text", "")
+                header_line = block.partition("\n")[0]
                 user_inv, user_mppt = self._interactive_array_config(
                     header_line,
                     array_data.get("inverter_ids", []),
@@ -1101,8 +1293,10 @@ class PVsystParser:
             arrays[array_id] = array_data
             seen_ids.add(array_id)
 
-            if trailing_equipment:
-                parsed_type = self._parse_pvsyst_inverter_type_block(trailing_equipment)
+            if m_eq:
+                parsed_type = self._parse_pvsyst_inverter_type_block(
+                    block_text[eq_start:]
+                )
                 if parsed_type:
                     pending_inverter_type = parsed_type
 
@@ -1180,30 +1374,15 @@ class PVsystParser:
             if not line:
                 continue
 
-            if re.search(r"Array Soiling Losses", line, re.IGNORECASE):
+            if _LOSS_SECTION_HEADER_RE.search(line):
+                # A line may name several headers; the first in priority order wins.
                 if current_section:
                     sections[current_section] = current_lines
-                current_section = "soiling_losses"
-                current_lines = [line]
-            elif re.search(r"Thermal Loss factor", line, re.IGNORECASE):
-                if current_section:
-                    sections[current_section] = current_lines
-                current_section = "thermal_losses"
-                current_lines = [line]
-            elif re.search(r"Module mismatch losses", line, re.IGNORECASE):
-                if current_section:
-                    sections[current_section] = current_lines
-                current_section = "module_mismatch_losses"
-                current_lines = [line]
-            elif re.search(r"IAM loss factor", line, re.IGNORECASE):
-                if current_section:
-                    sections[current_section] = current_lines
-                current_section = "iam_losses"
-                current_lines = [line]
-            elif re.search(r"AC wiring losses", line, re.IGNORECASE):
-                if current_section:
-                    sections[current_section] = current_lines
-                current_section = "ac_wiring_losses"
+                current_section = next(
+                    key
+                    for key, pattern in _LOSS_SECTION_HEADERS
+                    if pattern.search(line)
+                )
                 current_lines = [line]
             else:
                 current_lines.append(line)
@@ -1236,28 +1415,15 @@ class PVsystParser:
         data: Dict[str, Any] = {}
         for line in lines:
             if "Average loss Fraction" in line:
-                m = re.search(r"Average loss Fraction\s+([\d.]+)%", line)
+                m = _AVG_LOSS_FRACTION_RE.search(line)
                 if m:
                     data["average_loss_fraction_percent"] = float(m.group(1))
-            elif re.search(r"\d+\.\d+%", line):
+            elif _DECIMAL_PERCENT_RE.search(line):
                 parts = line.split()
-                months = [
-                    "Jan",
-                    "Feb",
-                    "Mar",
-                    "Apr",
-                    "May",
-                    "Jun",
-                    "Jul",
-                    "Aug",
-                    "Sep",
-                    "Oct",
-                    "Nov",
-                    "Dec",
-                ]
                 if len(parts) >= 12:
                     data["monthly_percentages"] = {
-                        months[i]: float(parts[i].rstrip("%")) for i in range(12)
+                        month: float(part.rstrip("%"))
+                        for month, part in zip(_SOILING_MONTHS, parts)
                     }
         return data
 
@@ -1265,15 +1431,15 @@ class PVsystParser:
         data: Dict[str, Any] = {}
         for line in lines:
             if "Loss Fraction" in line and "Module temperature" not in line:
-                m = re.search(r"Loss Fraction\s+(-?[\d.]+)%", line)
+                m = _SIGNED_LOSS_FRACTION_RE.search(line)
                 if m:
                     data["loss_fraction_percent"] = float(m.group(1))
             elif "Uc (const)" in line:
-                m = re.search(r"Uc \(const\)\s+([\d.]+)", line)
+                m = _UC_CONST_RE.search(line)
                 if m:
                     data["uc_const_w_per_m2_k"] = float(m.group(1))
             elif "Uv (wind)" in line:
-                m = re.search(r"Uv \(wind\)\s+([\d.]+)", line)
+                m = _UV_WIND_RE.search(line)
                 if m:
                     data["uv_wind_w_per_m2_k_per_ms"] = float(m.group(1))
         return data
@@ -1282,31 +1448,30 @@ class PVsystParser:
         data: Dict[str, Any] = {}
         for line in lines:
             if "Loss Fraction" in line:
-                m = re.search(r"Loss Fraction\s+([\d.]+)%", line)
+                m = _LOSS_FRACTION_RE.search(line)
                 if m:
                     data["loss_fraction_percent"] = float(m.group(1))
         return data
 
     def _parse_iam_losses(self, lines: List[str]) -> Dict[str, Any]:
         data: Dict[str, Any] = {}
+        # Section lines arrive stripped and non-empty from parse_array_losses_section.
         for line in lines:
-            line = line.strip()
-            if not line:
-                continue
             if "DC wiring losses" in line or "Array #" in line:
                 break
             if "Incidence effect (IAM):" in line:
-                m = re.search(r"Incidence effect \(IAM\):\s+(.+)", line)
+                m = _IAM_EFFECT_RE.search(line)
                 if m:
                     data["incidence_effect"] = m.group(1).strip()
-            elif re.search(r"\d+\.\d+", line) and not any(
-                c in line for c in ["°", "mΩ", "%"]
+            elif (
+                "°" not in line
+                and "mΩ" not in line
+                and "%" not in line
+                and _DECIMAL_RE.search(line)
             ):
                 parts = line.split()
                 if all(p.replace(".", "").replace("-", "").isdigit() for p in parts):
-                    factors = [float(p) for p in parts]
-                    angles = [0, 20, 30, 40, 50, 60, 70, 80, 90]
-                    data["iam_profile"] = dict(zip(angles, factors))
+                    data["iam_profile"] = dict(zip(_IAM_ANGLES, map(float, parts)))
         return data
 
     def _parse_dc_wiring_losses(self, lines: List[str]) -> Dict[str, Any]:
@@ -1314,22 +1479,17 @@ class PVsystParser:
         full_text = " ".join(lines)
 
         if "Global wiring resistance" in full_text:
-            m = re.search(
-                r"Global wiring resistance\s+([\d.]+)mΩ\s+Loss Fraction\s+([\d.]+)%",
-                full_text,
-            )
+            m = _GLOBAL_WIRING_RE.search(full_text)
             if m:
                 data["global_wiring_resistance_mohm"] = float(m.group(1))
                 data["global_loss_fraction_percent"] = float(m.group(2))
 
         notations: List[Tuple[int, str]] = []
-        for match in re.finditer(
-            r"Array #(\d+)\s*-\s*(.+?)(?=Array #|\s*Global|$)", full_text
-        ):
+        for match in _ARRAY_NOTATION_RE.finditer(full_text):
             notations.append((int(match.group(1)), match.group(2).strip()))
 
-        res_list = re.findall(r"Global array res\.\s*([\d.]+)mΩ", full_text)
-        loss_list = re.findall(r"Loss Fraction\s+([\d.]+)%", full_text)
+        res_list = _GLOBAL_RES_RE.findall(full_text)
+        loss_list = _LOSS_FRACTION_RE.findall(full_text)
 
         if (
             notations
@@ -1354,42 +1514,44 @@ class PVsystParser:
         data: Dict[str, Any] = {}
         for line in lines:
             if "Loss Fraction" in line:
-                m = re.search(r"Loss Fraction\s+([\d.]+)%", line)
+                m = _LOSS_FRACTION_RE.search(line)
                 if m:
                     data["loss_fraction_percent"] = float(m.group(1))
             elif "Inverter voltage" in line:
-                m = re.search(r"Inverter voltage\s+([\d.]+)Vac", line)
+                m = _INV_VOLTAGE_RE.search(line)
                 if m:
                     data["inverter_voltage_vac"] = float(m.group(1))
             elif "Wire section" in line:
-                m = re.search(r"Wire section\s+(.+)", line)
+                m = _WIRE_SECTION_RE.search(line)
                 if m:
                     data["wire_section"] = m.group(1).strip()
             elif "Wires length" in line:
-                m = re.search(r"Wires length\s+([\d.]+)m", line)
+                m = _WIRES_LENGTH_RE.search(line)
                 if m:
                     data["wires_length_m"] = float(m.group(1))
         return data
 
     def _write_array_losses_text(self, f, losses: Dict[str, Any]) -> None:
+        out: List[str] = []
         for key, value in losses.items():
-            f.write(f"{key.replace('_', ' ').title()}:\n")
+            out.append(f"{key.replace('_', ' ').title()}:\n")
             if isinstance(value, dict):
                 for sub_key, sub_value in value.items():
-                    f.write(f"  {sub_key.replace('_', ' ').title()}: {sub_value}\n")
+                    out.append(f"  {sub_key.replace('_', ' ').title()}: {sub_value}\n")
             elif isinstance(value, list):
                 for item in value:
                     if isinstance(item, dict):
                         for sub_key, sub_value in item.items():
-                            f.write(
+                            out.append(
                                 f"  {sub_key.replace('_', ' ').title()}: {sub_value}\n"
                             )
-                        f.write("\n")
+                        out.append("\n")
                     else:
-                        f.write(f"  {item}\n")
+                        out.append(f"  {item}\n")
             else:
-                f.write(f"  {value}\n")
-            f.write("\n")
+                out.append(f"  {value}\n")
+            out.append("\n")
+        f.write("".join(out))
 
     # -------------------------------------------------------------------------
     # Inverter types / production
@@ -1397,44 +1559,51 @@ class PVsystParser:
 
     def _collect_inverter_types(self) -> List[Dict[str, Any]]:
         types: Dict[Tuple[str, str, float], Dict[str, Any]] = {}
-        type_counter = 1
 
+        def type_id_for(man: Any, mod: Any, power: Any) -> str:
+            key = (man or "", mod or "", float(power or 0))
+            inv_type = types.get(key)
+            if inv_type is None:
+                inv_type = {
+                    "id": f"inverter_{len(types) + 1}",
+                    "manufacturer": man,
+                    "model": mod,
+                    "unit_nom_power_kw": power,
+                }
+                types[key] = inv_type
+            return inv_type["id"]
+
+        # Arrays without their own inverter details fall back to the global type.
+        untyped: List[Dict[str, Any]] = []
         for arr_data in self.arrays.values():
             man = arr_data.get("inverter_manufacturer")
             mod = arr_data.get("inverter_model")
             power = arr_data.get("inverter_unit_nom_power_kw")
             if man or mod or power is not None:
-                key = (man or "", mod or "", float(power or 0))
-                if key not in types:
-                    type_id = f"inverter_{type_counter}"
-                    types[key] = {
-                        "id": type_id,
-                        "manufacturer": man,
-                        "model": mod,
-                        "unit_nom_power_kw": power,
-                    }
-                    type_counter += 1
-                arr_data["inverter_type_id"] = types[key]["id"]
+                arr_data["inverter_type_id"] = type_id_for(man, mod, power)
+            else:
+                untyped.append(arr_data)
 
         global_man = self.inverter_info.get("manufacturer")
         global_mod = self.inverter_info.get("model")
         global_power = self.inverter_info.get("unit_nom_power_kw")
         if global_man or global_mod or global_power is not None:
-            key = (global_man or "", global_mod or "", float(global_power or 0))
-            if key not in types:
-                type_id = f"inverter_{type_counter}"
-                types[key] = {
-                    "id": type_id,
-                    "manufacturer": global_man,
-                    "model": global_mod,
-                    "unit_nom_power_kw": global_power,
-                }
-            for arr_data in self.arrays.values():
-                arr_data.setdefault("inverter_type_id", types[key]["id"])
+            global_type_id = type_id_for(global_man, global_mod, global_power)
+            for arr_data in untyped:
+                arr_data.setdefault("inverter_type_id", global_type_id)
 
         return list(types.values())
 
+    def _inverter_types_by_id(self) -> Dict[str, Dict[str, Any]]:
+        """Index self.inverter_types by id."""
+        return {
+            str(t.get("id")): t
+            for t in self.inverter_types
+            if isinstance(t, dict) and t.get("id") is not None
+        }
+
     @staticmethod
+    @lru_cache(maxsize=64)
     def _format_kw(kw: Any) -> str:
         if kw is None:
             return "?"
@@ -1446,26 +1615,33 @@ class PVsystParser:
             return str(int(fkw))
         return str(fkw)
 
-    def _inverter_display_name(self, inverter_id: str) -> str:
-        """Format inverter display name as: Inv [n] - ([kW] kW) - [mfr] [model]."""
-        type_by_id: Dict[str, Dict[str, Any]] = {
-            str(t.get("id")): t
-            for t in self.inverter_types
-            if isinstance(t, dict) and t.get("id")
-        }
-
-        inverter_type_id: Optional[str] = None
-        # Use first linked array's inverter_type_id (if present)
+    def _inverter_type_ids(self) -> Dict[str, str]:
+        """Map each inverter to the inverter_type_id of its first linked array."""
+        inv_type_ids: Dict[str, str] = {}
         for combo in self.expanded_arrays:
-            if combo.get("inverter") != inverter_id:
+            inv = combo.get("inverter")
+            if inv in inv_type_ids:
                 continue
             arr = self.arrays.get(str(combo.get("array_id")), {})
             tid = arr.get("inverter_type_id")
             if tid:
-                inverter_type_id = str(tid)
-                break
+                inv_type_ids[inv] = str(tid)
+        return inv_type_ids
 
-        type_data = type_by_id.get(inverter_type_id or "") if inverter_type_id else None
+    def _inverter_display_name(
+        self,
+        inverter_id: str,
+        inv_type_ids: Dict[str, str],
+        type_by_id: Dict[str, Dict[str, Any]],
+    ) -> str:
+        """Format inverter display name as: Inv [n] - ([kW] kW) - [mfr] [model].
+
+        inv_type_ids and type_by_id come from _inverter_type_ids() and
+        _inverter_types_by_id(), built once by the caller.
+        """
+        # Use first linked array's inverter_type_id (if present)
+        inverter_type_id = inv_type_ids.get(inverter_id)
+        type_data = type_by_id.get(inverter_type_id) if inverter_type_id else None
 
         manufacturer = None
         model = None
@@ -1490,7 +1666,7 @@ class PVsystParser:
 
         # Prefer "Inv NN" prefix for display (keep raw inverter_id elsewhere).
         label = inverter_id
-        m = re.match(r"^INV([A-Za-z]*)(\d+)$", inverter_id, re.IGNORECASE)
+        m = _INV_LABEL_RE.match(inverter_id)
         if m and not m.group(1):
             label = f"Inv {int(m.group(2)):02d}"
 
@@ -1504,38 +1680,16 @@ class PVsystParser:
         self.system_monthly_globhor = {}
         monthly_data: Dict[str, float] = {}
 
-        all_lines: List[str] = []
-        for p in sorted(blocks.keys()):
-            txt = blocks[p].get("full_text", "") or ""
-            all_lines.extend(txt.splitlines())
-
-        month_pattern = re.compile(
-            r"^(January|February|March|April|May|June|July|August|September|October|November|December)\b"
-        )
-
-        for raw_line in all_lines:
-            line = raw_line.strip()
-            if not line:
-                continue
-
-            m = month_pattern.match(line)
+        month_row = _MONTH_ROW_RE.match
+        for raw_line in self._joined_text(blocks).splitlines():
+            m = month_row(raw_line.strip())
             if not m:
                 continue
 
-            month = m.group(1)
-            parts = line.split()
-            if len(parts) < 8:
-                continue
-
-            if not re.match(r"[-\d.,]+$", parts[1]):
-                continue
-
-            def to_float(s: str) -> float:
-                return float(s.replace(",", ""))
-
+            month, globhor_text, e_grid_text = m.groups()
             try:
-                globhor = to_float(parts[1])
-                e_grid = to_float(parts[-2])
+                globhor = _to_float(globhor_text)
+                e_grid = _to_float(e_grid_text)
             except ValueError:
                 continue
 
@@ -1551,49 +1705,77 @@ class PVsystParser:
         return monthly_data
 
     def extract_total_modules(self, blocks: Dict[int, Dict[str, Any]]) -> int:
-        all_text = "\n".join(
-            blocks[p].get("full_text") or "" for p in sorted(blocks.keys())
-        )
-        match = re.search(r"Nb\.\s*of\s*modules\s*(\d+)units?", all_text)
+        all_text = self._joined_text(blocks)
+        match = _MODULES_RE.search(all_text)
         if match:
             return int(match.group(1))
 
         return sum(int(a.get("number_of_modules") or 0) for a in self.arrays.values())
 
-    def calculate_inverter_capacities_and_modules(
+    def _group_combinations(
         self,
-    ) -> Tuple[Dict[str, float], Dict[str, int]]:
+    ) -> Tuple[
+        Dict[str, List[Dict[str, Any]]],
+        Dict[str, List[Dict[str, Any]]],
+        Dict[str, Dict[str, List[Dict[str, Any]]]],
+    ]:
+        """Group expanded_arrays by inverter, by array (config) id, and by both.
+
+        Each grouping keeps expanded_arrays order.
+        """
         by_inverter: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        by_array: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        by_inverter_array: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
         for combo in self.expanded_arrays:
-            by_inverter[combo["inverter"]].append(combo)
+            inv = combo["inverter"]
+            array_id = str(combo["array_id"])
+            by_inverter[inv].append(combo)
+            by_array[array_id].append(combo)
+            by_inverter_array.setdefault(inv, defaultdict(list))[array_id].append(combo)
+
+        return (
+            dict(by_inverter),
+            dict(by_array),
+            {inv: dict(arrays) for inv, arrays in by_inverter_array.items()},
+        )
 
-        array_usage_count: Dict[str, set[str]] = {}
-        for inverter, combinations in by_inverter.items():
-            for combo in combinations:
-                array_id = str(combo["array_id"])
-                array_usage_count.setdefault(array_id, set()).add(inverter)
+    def calculate_inverter_capacities_and_modules(
+        self,
+    ) -> Tuple[Dict[str, float], Dict[str, int]]:
+        _, _, by_inverter_array = self._group_combinations()
+
+        # Number of inverters sharing each array, from the single grouping pass.
+        array_usage_sizes: Dict[str, int] = defaultdict(int)
+        for by_array in by_inverter_array.values():
+            for array_id in by_array:
+                array_usage_sizes[array_id] += 1
+
+        # Per-array (capacity, modules, sharing inverters), read once per array.
+        array_shares: Dict[str, Tuple[float, int, int]] = {}
+        for array_id, num_users in array_usage_sizes.items():
+            array_data = self.arrays.get(array_id)
+            if array_data is None:
+                continue
+            array_shares[array_id] = (
+                float(array_data.get("nominal_stc_kwp") or 0.0),
+                int(array_data.get("number_of_modules") or 0),
+                num_users,
+            )
 
         inverter_capacities: Dict[str, float] = {}
         inverter_modules: Dict[str, int] = {}
 
         print("  Calculating inverter capacities and module counts...")
-        for inverter, combinations in by_inverter.items():
+        for inverter, by_array in by_inverter_array.items():
             total_capacity = 0.0
             total_modules = 0
 
-            by_array: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-            for combo in combinations:
-                by_array[str(combo["array_id"])].append(combo)
-
             for array_id, array_combos in by_array.items():
-                if array_id not in self.arrays:
+                share = array_shares.get(array_id)
+                if share is None:
                     continue
 
-                array_data = self.arrays[array_id]
-                array_capacity = float(array_data.get("nominal_stc_kwp") or 0.0)
-                array_modules = int(array_data.get("number_of_modules") or 0)
-
-                num_inverters_using_array = len(array_usage_count.get(array_id, set()))
+                array_capacity, array_modules, num_inverters_using_array = share
                 mppts_per_inverter = len(array_combos)
 
                 total_mppts = num_inverters_using_array * mppts_per_inverter
@@ -1630,13 +1812,20 @@ class PVsystParser:
             return {}
 
         inverter_monthly: Dict[str, Dict[str, float]] = {}
+        # Inverters with the same module count get the same rounded row.
+        rows_by_count: Dict[int, Dict[str, float]] = {}
         print("  Calculating monthly production allocation...")
         for inverter, module_count in inverter_modules.items():
-            share = module_count / total_system_modules if total_system_modules else 0.0
-            inverter_monthly[inverter] = {
-                month: round(system_production * share, 0)
-                for month, system_production in monthly_data.items()
-            }
+            row = rows_by_count.get(module_count)
+            if row is None:
+                share = (
+                    module_count / total_system_modules if total_system_modules else 0.0
+                )
+                row = rows_by_count[module_count] = {
+                    month: round(system_production * share, 0)
+                    for month, system_production in monthly_data.items()
+                }
+            inverter_monthly[inverter] = dict(row)
 
         self.monthly_production = inverter_monthly
         return inverter_monthly
@@ -1647,89 +1836,64 @@ class PVsystParser:
 
     def generate_text_report(self, output_path: str) -> None:
         print(f"  Generating text report: {output_path}")
+        inv_type_ids = self._inverter_type_ids()
+        type_by_id = self._inverter_types_by_id()
+
+        parts: List[str] = []
+        parts.append("PVsyst PDF Analysis Report (V3)\n")
+        parts.append("=" * 60 + "\n\n")
+
+        parts.append("SUMMARY\n" + "-" * 20 + "\n")
+        parts.append(f"Total Arrays Found: {len(self.arrays)}\n")
+        parts.append(f"Total Expanded Combinations: {len(self.expanded_arrays)}\n")
+        parts.append(f"Total Inverters: {len(self.inverter_capacities)}\n")
+        parts.append(f"Sections Identified: {len(self.sections)}\n\n")
+
+        if self.monthly_production:
+            parts.append("MONTHLY PRODUCTION SUMMARY\n" + "-" * 35 + "\n")
+            for inverter in sorted(self.monthly_production.keys()):
+                display_name = self._inverter_display_name(
+                    inverter, inv_type_ids, type_by_id
+                )
+                cap = float(self.inverter_capacities.get(inverter, 0.0) or 0.0)
+                annual = sum(self.monthly_production[inverter].values())
+                spec = (annual / cap) if cap > 0 else 0.0
+                parts.append(
+                    f"{display_name}: {cap:.1f} kWp, {annual:,.0f} kWh/year ({spec:.0f} kWh/kWp)\n"
+                )
+            parts.append("\n")
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write("PVsyst PDF Analysis Report (V3)\n")
-            f.write("=" * 60 + "\n\n")
-
-            f.write("SUMMARY\n" + "-" * 20 + "\n")
-            f.write(f"Total Arrays Found: {len(self.arrays)}\n")
-            f.write(f"Total Expanded Combinations: {len(self.expanded_arrays)}\n")
-            f.write(f"Total Inverters: {len(self.inverter_capacities)}\n")
-            f.write(f"Sections Identified: {len(self.sections)}\n\n")
-
-            if self.monthly_production:
-                f.write("MONTHLY PRODUCTION SUMMARY\n" + "-" * 35 + "\n")
-                for inverter in sorted(self.monthly_production.keys()):
-                    display_name = self._inverter_display_name(inverter)
-                    cap = float(self.inverter_capacities.get(inverter, 0.0) or 0.0)
-                    annual = sum(self.monthly_production[inverter].values())
-                    spec = (annual / cap) if cap > 0 else 0.0
-                    f.write(
-                        f"{display_name}: {cap:.1f} kWp, {annual:,.0f} kWh/year ({spec:.0f} kWh/kWp)\n"
-                    )
-                f.write("\n")
+        if self.array_losses:
+            parts.append("ARRAY LOSSES\n" + "-" * 15 + "\n")
 
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write("".join(parts))
             if self.array_losses:
-                f.write("ARRAY LOSSES\n" + "-" * 15 + "\n")
                 self._write_array_losses_text(f, self.array_losses)
 
-    def _build_output_data(self) -> Dict[str, Any]:
-        # Ensure MPPT labels are present for all combinations.
-        if self.expanded_arrays:
-            self._assign_missing_mppt_labels()
-
-        def _rename_array_id_to_config_id(obj: Any) -> Any:
-            if isinstance(obj, dict):
-                out: Dict[str, Any] = {}
-                for k, v in obj.items():
-                    key = "config_id" if k == "array_id" else k
-                    out[key] = _rename_array_id_to_config_id(v)
-                return out
-            if isinstance(obj, list):
-                return [_rename_array_id_to_config_id(x) for x in obj]
-            return obj
-
-        # Array configurations (drop internal fields)
-        array_configurations: Dict[str, Any] = {}
-        for array_id, array_data in self.arrays.items():
-            array_configurations[array_id] = {
-                k: v
-                for k, v in array_data.items()
-                if k
-                not in [
-                    "expanded_combinations",
-                    "original_notation",
-                    "inverter_manufacturer",
-                    "inverter_model",
-                    "inverter_unit_nom_power_raw",
-                    "inverter_unit_nom_power_kw",
-                    "module_manufacturer",
-                    "module_model",
-                    "module_unit_nom_power_raw",
-                    "module_unit_nom_power_w",
-                ]
-            }
-
-        array_configurations = {
-            k: _rename_array_id_to_config_id(v) for k, v in array_configurations.items()
-        }
-
-        # MPPT allocation mapping: distribute strings across unique (inv, mppt) endpoints for each array.
-        mppt_allocation: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    def _build_mppt_allocation(
+        self, by_array: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+        """Distribute each array's strings across its unique (inv, mppt) endpoints.
 
-        combos_by_array: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
-        for combo in self.expanded_arrays:
-            mppt = combo.get("mppt")
-            if mppt is None:
+        by_array is the per-config grouping from _group_combinations(). Returns a
+        nested mapping config_id -> inverter_id -> mppt holding the
+        strings/modules/dc_kwp allocated to that endpoint.
+        """
+        mppt_allocation: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+
+        for arr_id, combos in by_array.items():
+            pairs = [
+                (combo["inverter"], str(combo["mppt"]))
+                for combo in combos
+                if combo.get("mppt") is not None
+            ]
+            if not pairs:
                 continue
-            combos_by_array[str(combo["array_id"])].append(
-                (combo["inverter"], str(mppt))
-            )
 
-        for arr_id, pairs in combos_by_array.items():
-            unique_endpoints = sorted(set(pairs))
+            unique_endpoints = sorted(dict.fromkeys(pairs))
             n_endpoints = len(unique_endpoints)
+            arr_allocation = mppt_allocation.setdefault(arr_id, {})
 
             arr = self.arrays.get(arr_id, {})
             strings_val = arr.get("strings")
@@ -1749,11 +1913,13 @@ class PVsystParser:
             if arr.get("inferred_single_config"):
                 strings_per_mppt_max = arr.get("inferred_strings_per_mppt_max")
                 if isinstance(strings_per_mppt_max, int) and strings_per_mppt_max > 0:
+                    # The id sorts order fully (number, then name), so the
+                    # deduplicated ids need no presort.
                     inv_ids = self._sort_inv_ids(
-                        sorted({inv for inv, _ in unique_endpoints})
+                        list(dict.fromkeys(inv for inv, _ in unique_endpoints))
                     )
                     mppt_ids = self._sort_mppt_ids(
-                        sorted({mppt for _, mppt in unique_endpoints})
+                        list(dict.fromkeys(mppt for _, mppt in unique_endpoints))
                     )
 
                     strings_alloc = self._allocate_strings_single_config(
@@ -1774,7 +1940,7 @@ class PVsystParser:
                         else:
                             dc_here = None
 
-                        mppt_allocation[(inv, mppt, arr_id)] = {
+                        arr_allocation.setdefault(inv, {})[mppt] = {
                             "strings": strings_here,
                             "modules": modules_here,
                             "dc_kwp": dc_here,
@@ -1789,64 +1955,94 @@ class PVsystParser:
                 base = 0
                 remainder = 0
 
-            for idx, (inv, mppt) in enumerate(unique_endpoints):
-                extra = 1 if idx < remainder else 0
-                strings_here = base + extra
+            # Endpoints get either base or base + 1 strings, so only two distinct
+            # (strings, modules, dc_kwp) rows exist; compute each once.
+            rows: List[Tuple[int, int, Optional[float]]] = []
+            for strings_here in (base + 1, base):
                 modules_here = strings_here * series
-
                 if stc_kwp and total_modules:
                     dc_here = round(float(stc_kwp) * (modules_here / total_modules), 3)
                 else:
                     dc_here = None
+                rows.append((strings_here, modules_here, dc_here))
 
-                mppt_allocation[(inv, mppt, arr_id)] = {
+            for idx, (inv, mppt) in enumerate(unique_endpoints):
+                strings_here, modules_here, dc_here = rows[0 if idx < remainder else 1]
+                arr_allocation.setdefault(inv, {})[mppt] = {
                     "strings": strings_here,
                     "modules": modules_here,
                     "dc_kwp": dc_here,
                 }
 
+        return mppt_allocation
+
+    def _build_output_data(self) -> Dict[str, Any]:
+        # Ensure MPPT labels are present for all combinations.
+        if self.expanded_arrays:
+            self._assign_missing_mppt_labels()
+        by_inverter, by_array, _ = self._group_combinations()
+        inv_type_ids = self._inverter_type_ids()
+        type_by_id = self._inverter_types_by_id()
+
+        def _rename_array_id_to_config_id(obj: Any) -> Any:
+            if isinstance(obj, dict):
+                out: Dict[str, Any] = {}
+                for k, v in obj.items():
+                    key = "config_id" if k == "array_id" else k
+                    out[key] = _rename_array_id_to_config_id(v)
+                return out
+            if isinstance(obj, list):
+                return [_rename_array_id_to_config_id(x) for x in obj]
+            return obj
+
+        # Array configurations (drop internal fields, array_id -> config_id)
+        array_configurations: Dict[str, Any] = {}
+        for array_id, array_data in self.arrays.items():
+            config: Dict[str, Any] = {}
+            for k, v in array_data.items():
+                if k in _ARRAY_INTERNAL_KEYS:
+                    continue
+                key = "config_id" if k == "array_id" else k
+                config[key] = _rename_array_id_to_config_id(v)
+            array_configurations[array_id] = config
+
+        mppt_allocation = self._build_mppt_allocation(by_array)
+
         # Associations (raw): inverter_id -> mppt -> config_id + allocation
+        # Walks the per-inverter grouping, which keeps expanded_arrays order.
         raw_associations: Dict[str, Dict[str, Dict[str, Any]]] = {}
-        for combo in self.expanded_arrays:
-            inv_id = combo["inverter"]
-            mppt = combo.get("mppt")
-            if mppt is None:
-                continue
-            mppt = str(mppt)
-            config_id = str(combo["array_id"])
+        for inv_id, combos in by_inverter.items():
+            inv_associations: Dict[str, Dict[str, Any]] = {}
+            for combo in combos:
+                mppt = combo.get("mppt")
+                if mppt is None:
+                    continue
+                mppt = str(mppt)
+                config_id = str(combo["array_id"])
 
-            raw_associations.setdefault(inv_id, {})
-            alloc = mppt_allocation.get((inv_id, mppt, config_id), {})
-            raw_associations[inv_id][mppt] = {"config_id": config_id, **alloc}
+                alloc = mppt_allocation.get(config_id, {}).get(inv_id, {}).get(mppt, {})
+                inv_associations[mppt] = {"config_id": config_id, **alloc}
+            if inv_associations:
+                raw_associations[inv_id] = inv_associations
 
         # Keep raw inverter IDs as keys in JSON.
         associations: Dict[str, Dict[str, Dict[str, Any]]] = raw_associations
         self.associations = associations
 
-        type_by_id: Dict[str, Dict[str, Any]] = {
-            str(t.get("id")): t
-            for t in self.inverter_types
-            if isinstance(t, dict) and t.get("id") is not None
-        }
-
         def inverter_type_for(inv_id: str) -> Optional[Dict[str, Any]]:
-            inverter_type_id: Optional[str] = None
-            for combo in self.expanded_arrays:
-                if combo.get("inverter") != inv_id:
-                    continue
-                arr = self.arrays.get(str(combo.get("array_id")), {})
-                tid = arr.get("inverter_type_id")
-                if tid:
-                    inverter_type_id = str(tid)
-                    break
-            if inverter_type_id and inverter_type_id in type_by_id:
-                return type_by_id[inverter_type_id]
+            inverter_type_id = inv_type_ids.get(inv_id)
+            if inverter_type_id:
+                return type_by_id.get(inverter_type_id)
             return None
 
+        # Per-config values shared by every MPPT that config feeds:
+        # (tilt, azimuth, modules_in_series, u_mpp_v, i_mpp_a, i_mpp per string).
+        config_values: Dict[str, Tuple[Any, Any, Any, Any, Any, Optional[float]]] = {}
+
         # Inverter summary (inverter_id-keyed) with one-place monitoring config.
         inverter_summary: Dict[str, Any] = {}
         for inv_id in sorted(raw_associations.keys()):
-            description = self._inverter_display_name(inv_id)
+            description = self._inverter_display_name(inv_id, inv_type_ids, type_by_id)
             inv_type = inverter_type_for(inv_id)
 
             cap = float(self.inverter_capacities.get(inv_id, 0.0) or 0.0)
@@ -1857,19 +2053,34 @@ class PVsystParser:
             combined: List[Dict[str, Any]] = []
             for mppt, assoc in sorted(raw_associations[inv_id].items()):
                 config_id = str(assoc.get("config_id"))
-                arr = self.arrays.get(config_id, {})
+                values = config_values.get(config_id)
+                if values is None:
+                    arr = self.arrays.get(config_id, {})
+                    strings_total = arr.get("strings")
+                    i_mpp_total = arr.get("i_mpp_a")
+                    i_mpp_per_string: Optional[float] = None
+                    if (
+                        isinstance(i_mpp_total, (int, float))
+                        and isinstance(strings_total, int)
+                        and strings_total > 0
+                    ):
+                        i_mpp_per_string = i_mpp_total / strings_total
+                    azimuth = arr.get("azimuth_deg")
+                    if azimuth is None:
+                        azimuth = arr.get("azimuth_compass_deg")
+                    values = config_values[config_id] = (
+                        arr.get("tilt"),
+                        azimuth,
+                        arr.get("modules_in_series"),
+                        arr.get("u_mpp_v"),
+                        i_mpp_total,
+                        i_mpp_per_string,
+                    )
+                tilt, azimuth, series, u_mpp, i_mpp_total, i_mpp_per_string = values
 
-                strings_total = arr.get("strings")
                 strings_on_mppt = assoc.get("strings")
-                i_mpp_total = arr.get("i_mpp_a")
-
                 i_mpp_mppt = i_mpp_total
-                if (
-                    isinstance(i_mpp_total, (int, float))
-                    and isinstance(strings_total, int)
-                    and strings_total > 0
-                ):
-                    i_mpp_per_string = i_mpp_total / strings_total
+                if i_mpp_per_string is not None:
                     if isinstance(strings_on_mppt, int) and strings_on_mppt > 0:
                         i_mpp_mppt = round(i_mpp_per_string * strings_on_mppt, 3)
                     else:
@@ -1882,12 +2093,10 @@ class PVsystParser:
                         "strings": strings_on_mppt,
                         "modules": assoc.get("modules"),
                         "dc_kwp": assoc.get("dc_kwp"),
-                        "tilt": arr.get("tilt"),
-                        "azimuth": arr.get("azimuth_deg")
-                        if arr.get("azimuth_deg") is not None
-                        else arr.get("azimuth_compass_deg"),
-                        "modules_in_series": arr.get("modules_in_series"),
-                        "u_mpp_v": arr.get("u_mpp_v"),
+                        "tilt": tilt,
+                        "azimuth": azimuth,
+                        "modules_in_series": series,
+                        "u_mpp_v": u_mpp,
                         "i_mpp_a": i_mpp_mppt,
                     }
                 )
@@ -1938,11 +2147,14 @@ class PVsystParser:
             "array_losses": _rename_array_id_to_config_id(self.array_losses),
         }
 
-    def generate_json_output(self, output_path: str) -> None:
+    def generate_json_output(
+        self, output_path: str, output_data: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Write the output structure; pass `output_data` to reuse a built one."""
         print(f"  Generating JSON output: {output_path}")
-        output_data = self._build_output_data()
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        if output_data is None:
+            output_data = self._build_output_data()
+        _dump_json(output_path, output_data)
 
     def to_dict(self) -> Dict[str, Any]:
         return self._build_output_data()
@@ -1972,48 +2184,59 @@ class PVsystParser:
         # Text extraction
         blocks = self.extract_text_blocks(pdf_path)
 
-        self.sections = self.identify_sections(blocks)
-        self.section_contents = self.extract_section_contents(blocks, self.sections)
+        # Join the document text once for the stages below.
+        self._all_text = self._joined_text(blocks)
+        self._all_text_lower = None
+        self._text_source = blocks
+        try:
+            self.sections = self.identify_sections(blocks)
+            self.section_contents = self.extract_section_contents(blocks, self.sections)
 
-        # Parse total inverter count from "Total Inverter Power" section if present
-        self.total_inverters_from_power_section = self._parse_total_inverter_power()
+            # Parse total inverter count from "Total Inverter Power" section if present
+            self.total_inverters_from_power_section = self._parse_total_inverter_power()
 
-        self.extract_equipment_info(blocks)
-        self.orientations = self.extract_orientations(blocks)
+            self.extract_equipment_info(blocks)
+            self.orientations = self.extract_orientations(blocks)
 
-        # Array losses (if present)
-        if (
-            "Array Losses" in self.section_contents
-            and self.section_contents["Array Losses"]
-        ):
-            try:
-                self.array_losses = self.parse_array_losses_section(
-                    self.section_contents["Array Losses"][0]
-                )
-            except Exception as exc:  # noqa: BLE001
-                print(f"  Warning: failed to parse array losses: {exc}")
+            # Array losses (if present)
+            if (
+                "Array Losses" in self.section_contents
+                and self.section_contents["Array Losses"]
+            ):
+                try:
+                    self.array_losses = self.parse_array_losses_section(
+                        self.section_contents["Array Losses"][0]
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    print(f"  Warning: failed to parse array losses: {exc}")
 
-        # Arrays
-        self.arrays = self.parse_arrays_from_text(blocks, interactive=interactive)
+            # Arrays
+            self.arrays = self.parse_arrays_from_text(blocks, interactive=interactive)
 
-        # Inverter types
-        self.inverter_types = self._collect_inverter_types()
+            # Inverter types
+            self.inverter_types = self._collect_inverter_types()
 
-        # Monthly production + inverter capacities
-        self.calculate_monthly_production(blocks)
+            # Monthly production + inverter capacities
+            self.calculate_monthly_production(blocks)
+        finally:
+            self._text_source = None
+            self._all_text = ""
+            self._all_text_lower = None
 
         # Write outputs
         text_path = out_dir / f"{pdf_name}_analysis_v3.txt"
         json_path = out_dir / f"{pdf_name}_structured_v3.json"
 
         self.generate_text_report(str(text_path))
-        self.generate_json_output(str(json_path))
+        # Build the output once for both the JSON file and the return value.
+        output_data = self._build_output_data()
+        self.generate_json_output(str(json_path), output_data)
 
         print("\nParsing complete!")
         print(f"  Text report: {text_path}")
         print(f"  JSON output: {json_path}")
 
-        return self.to_dict()
+        return output_data
 
 
 def main() -> None: